@@ -0,0 +1,18 @@
+import numba
+import numpy as np
+
+
+# Compiled version of the numpy path of LinearGrad.n_colors, filling the output in a single parallel pass
+@numba.njit(parallel=True, cache=True)
+def n_colors(stops, n, stripped):
+    sub = 1 if stripped else -1
+    last = stops.shape[0] - 1
+    out = np.empty((n, stops.shape[1]))
+    for i in numba.prange(n):
+        x = (i + stripped)/(n + sub)*last
+        j = int(x)
+        k = j + 1 if j < last else last
+        t = x - j
+        for c in range(stops.shape[1]):
+            out[i, c] = stops[j, c] + (stops[k, c] - stops[j, c])*t
+    return out
@@ -0,0 +1,53 @@
+import numpy as np
+
+# Vectorized versions of the conversion functions in colordict.general
+# They take an array with one color per row and return an array with one converted color per row
+# Values outside the norms accepted by the scalar functions are not checked
+
+
+# Hue shared by hls and hsv, from the channels, their maximum and their range
+def _hue(rgb, maxc, rangec):
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rc = (maxc - r)/rangec
+        gc = (maxc - g)/rangec
+        bc = (maxc - b)/rangec
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    return np.where(rangec == 0, 0.0, (h/6.0) % 1.0)
+
+
+# Converts rgb colors with norm=1 to yiq
+def rgb_to_yiq(arr):
+    arr = np.asarray(arr, dtype=float)
+    r, g, b = arr[:, 0], arr[:, 1], arr[:, 2]
+    y = 0.30*r + 0.59*g + 0.11*b
+    return np.stack([y, 0.74*(r - y) - 0.27*(b - y), 0.48*(r - y) + 0.41*(b - y)], axis=1)
+
+
+# Converts rgb colors with norm=1 to hls
+def rgb_to_hls(arr):
+    arr = np.asarray(arr, dtype=float)
+    maxc = arr[:, :3].max(axis=1)
+    minc = arr[:, :3].min(axis=1)
+    rangec = maxc - minc
+    l = (maxc + minc)/2.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(l <= 0.5, rangec/(maxc + minc), rangec/(2.0 - maxc - minc))
+    s = np.where(rangec == 0, 0.0, s)
+    return np.stack([_hue(arr, maxc, rangec), l, s], axis=1)
+
+
+# Converts rgb colors with norm=1 to hsv
+def rgb_to_hsv(arr):
+    arr = np.asarray(arr, dtype=float)
+    maxc = arr[:, :3].max(axis=1)
+    rangec = maxc - arr[:, :3].min(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(rangec == 0, 0.0, rangec/maxc)
+    return np.stack([_hue(arr, maxc, rangec), s, maxc], axis=1)
+
+
+# Converts rgb colors with norm=255 to a list of hex strings
+def rgb_to_hex(arr):
+    hex_ = np.asarray(arr)[:, :3].astype(np.uint8).tobytes().hex()
+    return ['#' + hex_[i:i + 6] for i in range(0, len(hex_), 6)]
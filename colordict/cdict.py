@@ -1,26 +1,162 @@
+import functools
+import hashlib
 import json
+import mmap
 import os
 import colordict.general as cg
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+__all__ = ['ColorDict']
 _package_path = os.path.dirname(__file__)
 
 
+# Functions that format a rgba value with norm "norm" into each of the retrieval modes
+# The ones that do actual work are memoized, since values are immutable tuples
+def _to_rgb(value, norm):
+    return value[:3]
+
+
+@functools.lru_cache(maxsize=4096)
+def _to_hex(value, norm):
+    return cg.rgb_to_hex(cg.renorm(value, norm, 255))
+
+
+def _converted(converter):
+    @functools.lru_cache(maxsize=4096)
+    def inner(value, norm):
+        return cg.renorm(converter(cg.renorm(value[:3], norm, 1)), 1, norm)
+
+    return inner
+
+
+_formatters = {'rgb': _to_rgb, 'hex': _to_hex,
+               'yiq': _converted(cg.rgb_to_yiq), 'hls': _converted(cg.rgb_to_hls), 'hsv': _converted(cg.rgb_to_hsv)}
+
+
+# Hashes the contents of a palette file to detect whether it needs to be rewritten
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+# Reads a palette file and returns its name, the hash of the file and its contents
+def _read_palette(palette):
+    with open(palette.path, 'rb') as file: data = file.read()
+    return palette.name[:-5], _digest(data), _loads(data)
+
+
+# Same as _read_palette but memory-maps the file, which orjson can parse without copying it
+def _map_palette(path):
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+        return os.path.splitext(os.path.basename(path))[0], _digest(view), _loads(view if orjson else bytes(view))
+
+
+# Rebuilds a pickled or copied ColorDict, setting its attributes before its items and recreating its indexes
+def _rebuild(cls, state, items):
+    obj = cls.__new__(cls)
+    for attr, value in state.items():
+        setattr(obj, attr, value)
+    obj._by_rgb, obj._name_palettes, obj._rgba_cache = {}, {}, {}
+    for name, value in items.items():
+        obj[name] = value
+    for palette, names in obj.palettes.items():
+        for name in names: obj._name_palettes.setdefault(name, set()).add(palette)
+    return obj
+
+
 class ColorDict(dict):
+    __slots__ = ('palettes', 'norm', 'mode', 'is_grayscale', 'palettes_path', '_changed', '_by_rgb', '_name_palettes',
+                 '_rgba_cache', '_disk_hash', '_palette_paths', '__weakref__')
+
     def __init__(self, norm=255, mode='rgb', is_grayscale=False, palettes='all', palettes_path=''):
         dict.__init__(self)
+        self._setup(norm, mode, is_grayscale, palettes_path)
+        if palettes == 'all':
+            wanted = None
+        else:
+            wanted = {palettes} if isinstance(palettes, str) else set(palettes)
+        with os.scandir(self.palettes_path) as it:
+            entries = [palette for palette in it if palette.name.endswith('.json') and palette.is_file()
+                       and (wanted is None or palette.name[:-5] in wanted)]
+        self._load([_read_palette(palette) for palette in entries], [palette.path for palette in entries])
+
+    # Palettes are read from "paths" and saved back to them, new palettes are saved to "palettes_path"
+    # (by default, the directory of the first file)
+    @classmethod
+    def from_files(cls, paths, norm=255, mode='rgb', is_grayscale=False, palettes_path=''):
+        paths = [os.fspath(path) for path in paths]
+        if not palettes_path and paths:
+            palettes_path = os.path.dirname(os.path.abspath(paths[0]))
+        cdict = cls.__new__(cls)
+        dict.__init__(cdict)
+        cdict._setup(norm, mode, is_grayscale, palettes_path)
+        loaded = [_map_palette(path) for path in paths]
+        seen = set()
+        for pal_name, _, _ in loaded:
+            if pal_name in seen:
+                raise ValueError(f'More than one file would be loaded as palette "{pal_name}"')
+            seen.add(pal_name)
+        cdict._load(loaded, paths, pin=True)
+        return cdict
+
+    def _setup(self, norm, mode, is_grayscale, palettes_path):
         self.palettes = {}
         self.norm = norm
         self.mode = mode
         self.is_grayscale = is_grayscale
         self.palettes_path = palettes_path if palettes_path else os.path.join(_package_path, 'palettes')
         self._changed = set()
-        for palette in os.scandir(self.palettes_path):
-            pal_name = palette.name[:palette.name.index('.')]
-            if palettes == 'all' or pal_name in palettes:
-                with open(palette.path, 'r') as file: pal_dict = json.load(file)
-                if pal_dict:
-                    self.palettes[pal_name] = list(pal_dict)
-                    for name, value in pal_dict.items():
-                        self[name] = cg.renorm(value, 255, self.norm)
+        self._by_rgb = {}
+        self._name_palettes = {}
+        self._rgba_cache = {}
+        self._disk_hash = {}
+        self._palette_paths = {}
+
+    # Loads the (name, hash, contents) tuples returned by _read_palette/_map_palette for the files in "paths"
+    # If "pin" is True, the palettes will be saved back to these files instead of the ones in "palettes_path"
+    def _load(self, loaded, paths, pin=False):
+        for (pal_name, digest, _), path in zip(loaded, paths):
+            self._disk_hash[path] = digest
+            if pin: self._palette_paths[pal_name] = path
+        self._ingest({pal_name: pal_dict for pal_name, _, pal_dict in loaded})
+
+    def __reduce__(self):
+        state = dict(getattr(self, '__dict__', {}))
+        for cls in type(self).__mro__:
+            slots = getattr(cls, '__slots__', ())
+            for attr in (slots,) if isinstance(slots, str) else slots:
+                if attr not in ('__dict__', '__weakref__', '_by_rgb', '_name_palettes', '_rgba_cache') \
+                        and hasattr(self, attr):
+                    state[attr] = getattr(self, attr)
+        return _rebuild, (type(self), state, dict(self))
+
+    # Loads palettes from {palette: {name: rgb_a}} dictionaries whose values have norm=255
+    def _ingest(self, pal_dicts):
+        names, values = [], []
+        for pal_name, pal_dict in pal_dicts.items():
+            if pal_dict:
+                self.palettes[pal_name] = list(pal_dict)
+                for name in pal_dict: self._name_palettes.setdefault(name, set()).add(pal_name)
+                names.extend(pal_dict)
+                values.extend(pal_dict.values())
+        norm = self.norm
+        for name, value in zip(names, [tuple([spec*norm/255 for spec in value]) for value in values]):
+            self[name] = value
+        self._rgba_cache.update((name, (dict.__getitem__(self, name), value)) for name, value in zip(names, values))
+
+    # Returns the value of a key as written to the palette files (norm=255)
+    # The cache maps each key to (stored value, file value) and is only used while the stored value is the same object
+    def _file_value(self, name):
+        value = dict.__getitem__(self, name)
+        cached = self._rgba_cache.get(name)
+        if cached is not None and cached[0] is value:
+            return cached[1]
+        file_value = [int(spec*255/self.norm) for spec in value]
+        self._rgba_cache[name] = value, file_value
+        return file_value
 
     def __getitem__(self, item):
         if isinstance(item, str):
@@ -30,28 +166,87 @@ class ColorDict(dict):
         value = dict.__getitem__(self, key)
         if self.is_grayscale:
             value = cg.grayscale(value)
-        if mode == 'rgb':
-            value = value[:3]
-        elif mode == 'hex':
-            value = cg.rgb_to_hex(cg.renorm(value, self.norm, 255))
-        elif mode in ['yiq', 'hls', 'hsv']:
-            converted = getattr(cg, 'rgb_to_' + mode)(cg.renorm(value[:3], self.norm, 1))
-            value = cg.renorm(converted, 1, self.norm)
-        return value
+        formatter = _formatters.get(mode)
+        return formatter(value, self.norm) if formatter else value
 
     def __setitem__(self, key, value):
-        value = tuple(value)
-        if not 3 <= len(value) <= 4:
+        if type(value) is not tuple: value = tuple(value)
+        n = len(value)
+        if not 3 <= n <= 4:
             raise ValueError("Values assigned to ColorDict keys must be in (r, g, b) or (r, g, b, a) format")
-        elif len(value) == 3:
+        elif n == 3:
             value += (self.norm,)
+        if key in self: self._unindex(key, dict.__getitem__(self, key))
         dict.__setitem__(self, key, value)
+        self._by_rgb.setdefault(value[:3], []).append(key)
+
+    def __delitem__(self, key):
+        self._unindex(key, dict.__getitem__(self, key))
+        self._rgba_cache.pop(key, None)
+        dict.__delitem__(self, key)
+
+    # The dict methods below are overridden so that they go through __setitem__/__delitem__ and keep the indexes in sync
+    def pop(self, key, *default):
+        if key not in self:
+            if default: return default[0]
+            raise KeyError(key)
+        value = dict.__getitem__(self, key)
+        del self[key]
+        return value
 
+    def popitem(self):
+        key, value = dict.popitem(self)
+        self._unindex(key, value)
+        self._rgba_cache.pop(key, None)
+        return key, value
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key, default=None):
+        if key not in self: self[key] = default
+        return dict.__getitem__(self, key)
+
+    def clear(self):
+        dict.clear(self)
+        self._by_rgb.clear()
+        self._rgba_cache.clear()
+
+    # Removes a key with value "value" from the reverse index of rgb values
+    def _unindex(self, key, value):
+        rgb = value[:3]
+        names = self._by_rgb[rgb]
+        names.remove(key)
+        if not names: del self._by_rgb[rgb]
+
+    # Values shorter than rgb can't be looked up in the index, so all keys whose values start with them are searched
     def named(self, rgb_a):
-        color_list = []
-        for name, value in self.items():
-            if value[:len(rgb_a)] == rgb_a: color_list.append(name)
-        return color_list
+        rgb_a = tuple(rgb_a)
+        if len(rgb_a) < 3:
+            return [name for name, value in self.items() if value[:len(rgb_a)] == rgb_a]
+        return [name for name in self._by_rgb.get(rgb_a[:3], ())
+                if dict.__getitem__(self, name)[:len(rgb_a)] == rgb_a]
+
+    # Returns the values of all keys, in key order, as a numpy array with one row per color
+    def to_array(self, mode=None):
+        import numpy as np
+        mode = self.mode if mode is None else mode
+        if mode == 'hex':
+            raise ValueError("Mode 'hex' can't be represented as a numeric array")
+        arr = np.array(list(self.values()), dtype=float).reshape(-1, 4)
+        if self.is_grayscale:
+            arr = np.repeat(arr[:, :3] @ np.array([0.3, 0.59, 0.11]), 3).reshape(-1, 3)
+        if mode == 'rgb':
+            arr = arr[:, :3]
+        elif mode in ('yiq', 'hls', 'hsv'):
+            from colordict import batch
+            arr = getattr(batch, 'rgb_to_' + mode)(arr/self.norm)*self.norm
+        return arr
 
     def add(self, name, rgb_a, palette='independent', check=True):
         if check and name in self:
@@ -59,31 +254,39 @@ class ColorDict(dict):
         else:
             self[name] = rgb_a
             if palette not in self.palettes: self.palettes[palette] = []
-            self.palettes[palette].append(name)
-            self._changed.add(palette)
+            pal_names = self._name_palettes.setdefault(name, set())
+            if palette not in pal_names:
+                self.palettes[palette].append(name)
+                pal_names.add(palette)
+            self._changed.update(pal_names)
 
     def remove(self, name, palette):
         self.palettes[palette].remove(name)
+        self._name_palettes[name].discard(palette)
         self._changed.add(palette)
 
     def remove_all(self, name):
         del self[name]
-        for palette, pal_list in self.palettes.items():
+        for palette in self._name_palettes.pop(name, ()):
+            self.palettes[palette].remove(name)
             self._changed.add(palette)
-            try: pal_list.remove(name)
-            except ValueError: pass
 
     def save(self):
         for palette in self._changed:
-            pal_dict = {name: [int(spec*255/self.norm) for spec in self[name, 'rgba']] for name in self.palettes[palette]}
-            with open(os.path.join(self.palettes_path, palette + '.json'), 'w') as file:
-                json.dump(pal_dict, file, indent=4)
+            pal_dict = {name: self._file_value(name) for name in self.palettes[palette]}
+            data = json.dumps(pal_dict, indent=4).encode()
+            digest = _digest(data)
+            path = self._palette_paths.get(palette) or os.path.join(self.palettes_path, palette + '.json')
+            if digest != self._disk_hash.get(path) or not os.path.isfile(path):
+                with open(path + '.tmp', 'wb') as file: file.write(data)
+                os.replace(path + '.tmp', path)
+                self._disk_hash[path] = digest
         self._changed.clear()
 
     def backup(self):
         color_dict = {}
         for palette, color_list in self.palettes.items():
-            color_dict[palette] = {name: [int(spec*255/self.norm) for spec in self[name, 'rgba']] for name in color_list}
+            color_dict[palette] = {name: self._file_value(name) for name in color_list}
         with open(os.path.join(_package_path, 'backup.json'), 'w') as file:
             json.dump(color_dict, file, indent=4)
 
@@ -91,11 +294,8 @@ class ColorDict(dict):
         self.clear()
         self.palettes.clear()
         self._changed.clear()
-        with open(os.path.join(_package_path, 'backup.json'), 'r') as file:
-            color_dict = json.load(file)
-        for palette, color_list in color_dict.items():
-            if color_list:
-                self.palettes[palette] = list(color_list)
-                self._changed.add(palette)
-                for name, value in color_list.items():
-                    self[name] = cg.renorm(value, 255, self.norm)
+        self._name_palettes.clear()
+        with open(os.path.join(_package_path, 'backup.json'), 'rb') as file:
+            color_dict = _loads(file.read())
+        self._ingest(color_dict)
+        self._changed.update(self.palettes)
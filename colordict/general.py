@@ -1,4 +1,9 @@
-import colorsys
+from colorsys import rgb_to_yiq as _rgb_to_yiq, yiq_to_rgb as _yiq_to_rgb
+from colorsys import hls_to_rgb as _hls_to_rgb, hsv_to_rgb as _hsv_to_rgb
+
+# Lookup tables between integers from 0 to 255 and their two-digit hex strings
+_hex_from_byte = {i: f'{i:02x}' for i in range(256)}
+_byte_from_hex = {hex_: i for i, hex_ in _hex_from_byte.items()}
 
 
 # Returns a color value normalized to "new"
@@ -9,26 +14,75 @@ def renorm(color_value, old, new):
 # Converts rgb color to grayscale
 # This can be used to visualize how a palette would look if printed in black and white
 def grayscale(rgb):
-    ws = (0.3, 0.59, 0.11)
-    return (sum(rgb[i]*ws[i] for i in range(3)),)*3
+    r, g, b = rgb[0], rgb[1], rgb[2]
+    gray = r*0.3 + g*0.59 + b*0.11
+    return gray, gray, gray
 
 
 # Converts rgb value with norm=255 to hex string
 def rgb_to_hex(rgb):
-    return '#%02x%02x%02x' % tuple([int(spec) for spec in rgb[:3]])
+    r, g, b = int(rgb[0]), int(rgb[1]), int(rgb[2])
+    try:
+        return '#' + _hex_from_byte[r] + _hex_from_byte[g] + _hex_from_byte[b]
+    except KeyError:
+        return '#%02x%02x%02x' % (r, g, b)
 
 
 # Converts hex value to rgb with norm=255
 def hex_to_rgb(hex_):
-    return tuple(int(hex_.strip('#')[i:i + 2], 16) for i in (0, 2, 4))
+    hex_ = hex_.strip('#').lower()
+    try:
+        return _byte_from_hex[hex_[0:2]], _byte_from_hex[hex_[2:4]], _byte_from_hex[hex_[4:6]]
+    except KeyError:
+        raise ValueError(f"'{hex_}' is not a valid hex color") from None
+
+
+# Converts between rgb with norm=1 and the other color systems
+def rgb_to_yiq(rgb):
+    return _rgb_to_yiq(*rgb)
+
+
+def yiq_to_rgb(yiq):
+    return _yiq_to_rgb(*yiq)
+
+
+def hls_to_rgb(hls):
+    return _hls_to_rgb(*hls)
+
+
+def hsv_to_rgb(hsv):
+    return _hsv_to_rgb(*hsv)
+
 
+# Hue shared by hls and hsv, same as in colorsys
+def _hue(r, g, b, maxc, rangec):
+    if r == maxc:
+        h = (maxc - b)/rangec - (maxc - g)/rangec
+    elif g == maxc:
+        h = 2.0 + (maxc - r)/rangec - (maxc - b)/rangec
+    else:
+        h = 4.0 + (maxc - g)/rangec - (maxc - r)/rangec
+    return (h/6.0) % 1.0
 
-def _tuplefier(func):
-    def inner(color_value):
-        return func(*color_value)
 
-    return inner
+# The conversions to hls and hsv are inlined instead of wrapping colorsys, as they are the most frequently used
+def rgb_to_hls(rgb):
+    r, g, b = rgb
+    maxc = max(r, g, b)
+    minc = min(r, g, b)
+    l = (maxc + minc)/2.0
+    if minc == maxc:
+        return 0.0, l, 0.0
+    rangec = maxc - minc
+    s = rangec/(maxc + minc) if l <= 0.5 else rangec/(2.0 - maxc - minc)
+    return _hue(r, g, b, maxc, rangec), l, s
 
 
-for conv_func in colorsys.__all__:
-    globals()[conv_func] = _tuplefier(getattr(colorsys, conv_func))
\ No newline at end of file
+def rgb_to_hsv(rgb):
+    r, g, b = rgb
+    maxc = max(r, g, b)
+    minc = min(r, g, b)
+    if minc == maxc:
+        return 0.0, 0.0, maxc
+    rangec = maxc - minc
+    return _hue(r, g, b, maxc, rangec), rangec/maxc, maxc
@@ -1,22 +1,80 @@
+import functools
+
+__all__ = ['LinearGrad']
 
 
 def _lin_interp(c1, c2, t):
-    return tuple([c1[i] + (c2[i] - c1[i])*t for i in range(len(c1))])
+    n = len(c1)
+    if n == 3:
+        return c1[0] + (c2[0] - c1[0])*t, c1[1] + (c2[1] - c1[1])*t, c1[2] + (c2[2] - c1[2])*t
+    if n == 4:
+        return (c1[0] + (c2[0] - c1[0])*t, c1[1] + (c2[1] - c1[1])*t, c1[2] + (c2[2] - c1[2])*t,
+                c1[3] + (c2[3] - c1[3])*t)
+    return tuple([c1[i] + (c2[i] - c1[i])*t for i in range(n)])
+
+
+# Returns the compiled version of LinearGrad.n_colors, or None if numba isn't installed
+@functools.lru_cache(maxsize=None)
+def _numba_kernel():
+    try:
+        from colordict._grad_numba import n_colors
+    except ImportError:
+        return None
+    return n_colors
 
 
 class LinearGrad(object):
+    __slots__ = ('_colors', '_stops')
+
     def __init__(self, color_values):
         super().__init__()
         self.colors = color_values
 
+    @property
+    def colors(self):
+        return self._colors
+
+    @colors.setter
+    def colors(self, color_values):
+        self._colors = tuple(color_values)
+        self._stops = None
+
+    # Returns the colors as a numpy array, built on first use, or False if numpy is missing or they can't be stacked
+    def _array(self):
+        if self._stops is None:
+            self._stops = False
+            try:
+                import numpy as np
+                if len({len(color) for color in self._colors}) == 1:
+                    self._stops = np.array(self._colors, dtype=float)
+            except (ImportError, TypeError, ValueError):
+                pass
+        return self._stops
+
     def __call__(self, p):
-        i = int(p*(len(self.colors) - 1))
-        return _lin_interp(self.colors[i], self.colors[min([i + 1, len(self.colors) - 1])], p*(len(self.colors) - 1) - i)
+        last = len(self.colors) - 1
+        i = int(p*last)
+        return _lin_interp(self.colors[i], self.colors[i + 1 if i < last else last], p*last - i)
 
-    def n_colors(self, n, stripped=True):
-        colors = []
+    # If "jit" is True and numba is installed, very many colors are interpolated by a compiled function instead
+    # (importing and compiling it has a one-time cost that only pays off over repeated calls with large "n")
+    def n_colors(self, n, stripped=True, jit=False):
         sub = 1 if stripped else -1
+        # For many colors, interpolate them all at once with numpy when possible
+        if n >= 32 and self._array() is not False:
+            stops = self._stops
+            n_colors_numba = _numba_kernel() if jit and n >= 1024 else None
+            if n_colors_numba is not None:
+                out = n_colors_numba(stops, n, int(stripped))
+            else:
+                import numpy as np
+                x = (np.arange(n) + stripped)/(n + sub)*(len(stops) - 1)
+                i = x.astype(int)
+                c1, c2 = stops[i], stops[np.minimum(i + 1, len(stops) - 1)]
+                out = c1 + (c2 - c1)*(x - i)[:, None]
+            return [tuple(color) for color in out.tolist()]
+        colors = []
         for i in range(n):
             p = (i + stripped) / (n + sub)
             colors.append(self.__call__(p))
-        return colors
\ No newline at end of file
+        return colors
@@ -0,0 +1,19 @@
+import pytest
+import colordict.general as cg
+
+np = pytest.importorskip('numpy')
+batch = pytest.importorskip('colordict.batch')
+
+_rgbs = [(0, 0, 0), (255, 255, 255), (255, 0, 0), (0, 128, 0), (75, 0, 130), (200, 63, 73), (128, 128, 128)]
+
+
+@pytest.mark.parametrize('name', ['rgb_to_yiq', 'rgb_to_hls', 'rgb_to_hsv'])
+def test_matches_scalar(name):
+    rgbs = [cg.renorm(rgb, 255, 1) for rgb in _rgbs]
+    converted = getattr(batch, name)(np.array(rgbs))
+    for row, rgb in zip(converted.tolist(), rgbs):
+        assert row == pytest.approx(getattr(cg, name)(rgb))
+
+
+def test_rgb_to_hex_matches_scalar():
+    assert batch.rgb_to_hex(np.array(_rgbs)) == [cg.rgb_to_hex(rgb) for rgb in _rgbs]
@@ -0,0 +1,157 @@
+import os
+import pickle
+import shutil
+import weakref
+import pytest
+import colordict as cd
+
+
+@pytest.fixture
+def palettes_path(tmp_path):
+    path = tmp_path / 'palettes'
+    shutil.copytree(os.path.join(os.path.dirname(cd.__file__), 'palettes'), path)
+    return str(path)
+
+
+@pytest.fixture
+def colors(palettes_path):
+    return cd.ColorDict(palettes_path=palettes_path)
+
+
+@pytest.mark.parametrize('palettes', ['css', ['css']])
+def test_load_some_palettes(palettes_path, palettes):
+    colors = cd.ColorDict(palettes_path=palettes_path, palettes=palettes)
+    assert list(colors.palettes) == ['css']
+    assert len(colors) == len(colors.palettes['css'])
+
+
+# Regression test: overwriting a color must mark the palettes that hold it as changed
+def test_add_marks_palettes_of_color_changed(colors):
+    colors.add('red', (1, 2, 3), 'fruits', check=False)
+    assert {'rainbow', 'fruits'} <= colors._changed
+
+
+def test_add_does_not_duplicate_names(colors):
+    colors.add('strawberry_jam', (200, 63, 73), 'fruits')
+    colors.add('strawberry_jam', (255, 0, 0), 'fruits', check=False)
+    assert colors.palettes['fruits'] == ['strawberry_jam']
+    assert colors['strawberry_jam'] == (255, 0, 0)
+
+
+def test_named_follows_dict_methods(colors):
+    colors['mango'] = (255, 130, 67)
+    assert colors.named((255, 130, 67)) == ['mango']
+    colors.update(mango=(1, 2, 3))
+    assert colors.named((255, 130, 67)) == []
+    assert colors.named((1, 2, 3, 255)) == ['mango']
+    colors.pop('mango')
+    assert colors.named((1, 2, 3)) == []
+    colors.setdefault('kiwi', (1, 2, 3))
+    assert colors.named((1, 2, 3)) == ['kiwi']
+    colors.clear()
+    assert colors.named((1, 2, 3)) == []
+
+
+def test_named_prefix(colors):
+    assert colors.named((255,)) == [name for name, value in colors.items() if value[0] == 255]
+    assert 'red' in colors.named((255, 0))
+
+
+def test_popitem_keeps_index(colors):
+    name, value = colors.popitem()
+    assert name not in colors
+    assert name not in colors.named(value)
+    with pytest.raises(KeyError):
+        cd.ColorDict.from_files([]).popitem()
+
+
+def test_update_is_saved(colors, palettes_path):
+    colors.update(red=(1, 2, 3))
+    colors.add('red', (1, 2, 3), 'rainbow', check=False)
+    colors.save()
+    assert cd.ColorDict(palettes_path=palettes_path, palettes=['rainbow'])['red'] == (1, 2, 3)
+
+
+def test_pickle_roundtrip(colors):
+    copy = pickle.loads(pickle.dumps(colors))
+    assert dict(copy) == dict(colors)
+    assert copy.palettes == colors.palettes
+    assert copy.named((255, 0, 0)) == colors.named((255, 0, 0))
+
+
+def test_weakref(colors):
+    assert weakref.ref(colors)() is colors
+
+
+def test_save_skips_unchanged_palettes(colors, monkeypatch):
+    replaced = []
+    monkeypatch.setattr(os, 'replace', lambda src, dst: replaced.append(dst))
+    colors._changed.add('rainbow')
+    colors.save()
+    assert replaced == []
+
+
+def test_save_writes_unchanged_palettes_to_new_or_missing_files(colors, palettes_path, tmp_path):
+    colors.palettes_path = str(tmp_path)
+    colors._changed.add('rainbow')
+    colors.save()
+    assert 'rainbow.json' in os.listdir(tmp_path)
+    os.remove(tmp_path / 'rainbow.json')
+    colors._changed.add('rainbow')
+    colors.save()
+    assert 'rainbow.json' in os.listdir(tmp_path)
+
+
+def test_save_replaces_file(colors, palettes_path):
+    colors.add('strawberry_jam', (200, 63, 73), 'rainbow')
+    colors.save()
+    assert not [name for name in os.listdir(palettes_path) if name.endswith('.tmp')]
+    reloaded = cd.ColorDict(palettes_path=palettes_path, palettes=['rainbow'])
+    assert reloaded['strawberry_jam'] == (200, 63, 73)
+    assert reloaded.palettes['rainbow'][-1] == 'strawberry_jam'
+
+
+def test_save_to_new_palettes_path(colors, palettes_path, tmp_path):
+    colors.palettes_path = str(tmp_path)
+    colors.add('strawberry_jam', (200, 63, 73), 'rainbow')
+    colors.save()
+    assert 'rainbow.json' in os.listdir(tmp_path)
+    assert 'strawberry_jam' not in cd.ColorDict(palettes_path=palettes_path, palettes='rainbow')
+
+
+def test_from_files(palettes_path, tmp_path):
+    other = tmp_path / 'other'
+    other.mkdir()
+    shutil.copy(os.path.join(palettes_path, 'rainbow.json'), other / 'rainbow.json')
+    colors = cd.ColorDict.from_files([other / 'rainbow.json'], norm=1)
+    assert list(colors.palettes) == ['rainbow']
+    assert colors['red'] == (1, 0, 0)
+    colors.add('strawberry_jam', (1, 0, 0), 'fruits')
+    colors.add('mango', (1, 0.5, 0), 'rainbow')
+    colors.save()
+    assert sorted(os.listdir(other)) == ['fruits.json', 'rainbow.json']
+    assert 'mango' in cd.ColorDict.from_files([str(other / 'rainbow.json')])
+
+
+def test_from_files_rejects_duplicate_names(palettes_path, tmp_path):
+    shutil.copy(os.path.join(palettes_path, 'rainbow.json'), tmp_path / 'rainbow.json')
+    with pytest.raises(ValueError):
+        cd.ColorDict.from_files([os.path.join(palettes_path, 'rainbow.json'), tmp_path / 'rainbow.json'])
+
+
+@pytest.mark.parametrize('mode', ['rgb', 'hls', 'hsv', 'yiq'])
+def test_to_array(colors, mode):
+    pytest.importorskip('numpy')
+    arr = colors.to_array(mode)
+    assert arr.shape == (len(colors), 3)
+    for row, name in zip(arr.tolist(), colors):
+        assert row == pytest.approx(colors[name, mode])
+
+
+def test_to_array_default_mode(palettes_path):
+    pytest.importorskip('numpy')
+    colors = cd.ColorDict(mode='hls', palettes_path=palettes_path, palettes='rainbow')
+    assert colors.to_array().tolist() == colors.to_array('hls').tolist()
+    colors.mode = 'hex'
+    with pytest.raises(ValueError):
+        colors.to_array()
@@ -0,0 +1,36 @@
+import pytest
+from colordict import LinearGrad
+
+_stops = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+
+
+# Same as LinearGrad.n_colors, one color at a time
+def _scalar_n_colors(grad, n, stripped):
+    sub = 1 if stripped else -1
+    return [grad((i + stripped)/(n + sub)) for i in range(n)]
+
+
+@pytest.mark.parametrize('stripped', [True, False])
+def test_n_colors_numpy(stripped):
+    pytest.importorskip('numpy')
+    grad = LinearGrad(_stops)
+    assert grad.n_colors(100, stripped) == pytest.approx(_scalar_n_colors(grad, 100, stripped))
+
+
+@pytest.mark.parametrize('stripped', [True, False])
+def test_n_colors_numba(stripped):
+    pytest.importorskip('numba')
+    grad = LinearGrad(_stops)
+    assert grad.n_colors(2000, stripped, jit=True) == pytest.approx(_scalar_n_colors(grad, 2000, stripped))
+
+
+def test_n_colors_after_colors_change():
+    grad = LinearGrad(_stops)
+    grad.n_colors(100)
+    grad.colors = [(0, 0, 0), (255, 255, 255)]
+    assert grad.n_colors(100) == pytest.approx(_scalar_n_colors(grad, 100, True))
+
+
+def test_n_colors_ragged():
+    grad = LinearGrad([(255, 0, 0), (0, 0, 255, 0)])
+    assert grad.n_colors(100, False)[::99] == [(255, 0, 0), (0, 0, 255, 0)]